@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any
+from typing import Any, cast
 
 class InfiniteColor(Enum):
     ORANGE = 0
@@ -8,20 +8,31 @@ class InfiniteColor(Enum):
     TURQUOISE = 3
     RED = 4
 
+    # Members are singletons compared by identity, so the C-level identity hash is consistent
+    # with equality and avoids ``Enum.__hash__`` (a Python-level ``hash(self._name_)``).
+    __hash__ = object.__hash__
+
     @classmethod
     def _missing_(cls, value: Any) -> "InfiniteColor":
         if isinstance(value, int):
+            # Enum already looked ``value`` up in ``_value2member_map_`` before calling
+            # ``_missing_``, so there is no need to check for an existing member again
             name = f"Color_{value}"
-            if name in cls.__members__:
-                return cls.__members__[name]
             member = object.__new__(cls)
             member._name_ = name
             member._value_ = value
             cls._value2member_map_[value] = member
+            # keep lookups by name (``InfiniteColor["Color_6"]``) working
             cls._member_map_[name] = member
             return member
         raise ValueError(f"{value!r} is not a valid {cls.__name__}")
 
+    @classmethod
+    def create_range(cls, n: int) -> list["InfiniteColor"]:
+        """Return the first ``n`` colors, creating any dynamic ``Color_{i}`` members in one pass."""
+        value_map = cls._value2member_map_
+        return [cast("InfiniteColor", value_map[i]) if i in value_map else cls(i) for i in range(n)]
+
 if __name__ == "__main__":
     new_color = InfiniteColor(10)
     print(new_color)
@@ -1,13 +1,23 @@
 
-import warnings
+import hashlib
+import sys
 from enum import Enum, auto, StrEnum
-from typing import cast
+from typing import Iterable
 
 import networkx as nx
 from color import InfiniteColor
 
+try:
+    # optional: igraph's VF2 is written in C and is much faster than networkx's
+    import igraph
+    _HAS_IGRAPH = True
+except ImportError:
+    _HAS_IGRAPH = False
+
 # graph representation of a puzzle that is unique up to isomorphism
 IsomorphicPuzzleGraph = nx.DiGraph
+# the same graph as an igraph ``Graph`` plus the kind of each vertex (0 for puzzle nodes, 1 for color classes)
+IsomorphicIGraph = tuple["igraph.GraphBase", list[int]]
 NodeID = int
 # a short hash that may have collisions
 # if graphs are isomorphic, they have the same hash
@@ -16,6 +26,11 @@ NodeID = int
 QuickHash = str
 # a longer hash that is unique with respect to isomorphism
 FullHash = str
+# a canonical form of the colored digraph (its sorted edges after canonical relabeling);
+# equal if and only if the puzzles are isomorphic
+PuzzleCertificate = tuple[tuple[int, int], ...]
+# a very cheap isomorphism invariant (sorted degree sequence and sorted color class sizes)
+PuzzleInvariant = tuple[tuple[int, ...], tuple[int, ...]]
 
 def embeddable(graph: nx.Graph) -> bool:
     """Return ``True`` if ``graph`` is planar.
@@ -26,50 +41,99 @@ def embeddable(graph: nx.Graph) -> bool:
 
     return nx.check_planarity(graph)[0]
 
-class WarningActionKind(StrEnum):
-    IGNORE = "ignore"
+# interned so that attribute dict lookups can compare keys by identity
+# (keyword arguments named ``color`` share the same interned string)
+_COLOR_KEY = sys.intern('color')
 
 class NodeAttributeName(StrEnum):
-    COLOR = 'color'
+    COLOR = _COLOR_KEY
+
+# lets VF2 reject vertex/color-class pairings as soon as it tries them
+# (the direction of the color edges already rules them out, but only further down the search)
+_same_kind = nx.algorithms.isomorphism.categorical_node_match('kind', None)
 
 class HashTracker:
+    __slots__ = ('hashes', 'certificates')
+
     def __init__(self):
-        self.hashes: dict[QuickHash, list[IsomorphicPuzzleGraph]] = {}
+        # full hashes and private collapsed copies of the puzzles seen so far, bucketed by their invariant
+        # (quick hashes and isomorphic graphs are only computed once a bucket needs a comparison)
+        self.hashes: dict[PuzzleInvariant, list[tuple[FullHash, "Puzzle"]]] = {}
+        # with igraph: the full hash of each canonical form seen so far, bucketed by invariant
+        # (used instead of ``hashes``)
+        self.certificates: dict[PuzzleInvariant, dict[PuzzleCertificate, FullHash]] = {}
 
     @classmethod
     def _merge(cls, hash, index) -> FullHash:
-        '''Take a quick hash and the index of the puzzle in the list corresponding to that hash and return the full hash.'''
+        '''Take the hash of a bucket and the index of the puzzle in that bucket and return the full hash.'''
         return f'{hash}_{index}'
 
+    @classmethod
+    def _new_full_hash(cls, invariant: PuzzleInvariant, index: int) -> FullHash:
+        '''Return the (interned) full hash of the ``index``-th isomorphism class with this invariant.'''
+        invariant_hash = hashlib.blake2b(repr(invariant).encode(), digest_size=8).hexdigest()
+        return sys.intern(cls._merge(invariant_hash, index))
+
     def full_hash(self, puzzle: "Puzzle") -> FullHash:
         '''
         Add the puzzle to the tracker and return its full hash.
+
+        The same (interned) string object is returned for every puzzle in an isomorphism class,
+        so comparing and looking up full hashes can short-circuit on identity.
         '''
-        quick_hash, iso_graph = puzzle.quick_hash, puzzle.iso_graph
-        if quick_hash not in self.hashes:
-            self.hashes[quick_hash] = [iso_graph]
-            return self._merge(quick_hash, 0)
-        else:
-            for index, existing_graph in enumerate(self.hashes[quick_hash]):
-                if nx.is_isomorphic(iso_graph, existing_graph):
-                    return self._merge(quick_hash, index)
-            # not isomorphic to any existing graph with this quick hash
-            self.hashes[quick_hash].append(iso_graph)
-            return self._merge(quick_hash, len(self.hashes[quick_hash]) - 1)
+        collapsed = puzzle.collapsed()
+        invariant = collapsed._invariant()
+        if _HAS_IGRAPH:
+            # isomorphic puzzles have equal canonical forms, so a dict lookup replaces VF2
+            certificates = self.certificates.setdefault(invariant, {})
+            certificate = collapsed._certificate()
+            full_hash = certificates.get(certificate)
+            if full_hash is None:
+                full_hash = certificates[certificate] = self._new_full_hash(invariant, len(certificates))
+            return full_hash
+
+        bucket = self.hashes.setdefault(invariant, [])
+        # when nothing has this invariant yet, no quick hash or isomorphism check is needed
+        # (the quick hash and colored graphs are taken from ``collapsed`` so that
+        # an uncollapsed puzzle isn't collapsed again for each of them)
+        if bucket:
+            quick_hash = collapsed.quick_hash
+            for full_hash, existing in bucket:
+                if existing.quick_hash == quick_hash and self._is_isomorphic(collapsed, existing):
+                    return full_hash
+        # not isomorphic to any existing puzzle with this invariant
+        full_hash = self._new_full_hash(invariant, len(bucket))
+        # ``collapsed`` is already a private copy unless the puzzle was collapsed to begin with
+        bucket.append((full_hash, collapsed.copy() if collapsed is puzzle else collapsed))
+        return full_hash
+
+    @staticmethod
+    def _is_isomorphic(puzzle: "Puzzle", other: "Puzzle") -> bool:
+        '''Run VF2 on the colored digraphs of the two puzzles.'''
+        return nx.is_isomorphic(puzzle.iso_graph, other.iso_graph, node_match=_same_kind)
         
     @staticmethod
-    def quick_hash(puzzle: "Puzzle") -> tuple[QuickHash, IsomorphicPuzzleGraph]:
-        """Return a quick (not collision-free) hash and its associated isomorphic graph for the given puzzle."""
-        puzzle = puzzle.copy()
-        puzzle.collapse()
-        iso_graph = puzzle.to_colored_digraph()
-        with warnings.catch_warnings():
-            warnings.simplefilter(cast("warnings._ActionKind", WarningActionKind.IGNORE), category=UserWarning)
-            quick_hash: QuickHash = nx.weisfeiler_lehman_graph_hash(iso_graph)
-        return quick_hash, iso_graph
+    def quick_hash(puzzle: "Puzzle") -> QuickHash:
+        """
+        Return a quick (not collision-free) hash for the given puzzle.
+
+        The result is cached on ``puzzle`` and reused until the puzzle is modified.
+        """
+        if not puzzle.recalc_quick_hash and puzzle._quick_hash is not None:
+            return puzzle._quick_hash
+        quick_hash: QuickHash = puzzle.collapsed()._structural_digest()
+        puzzle._quick_hash = quick_hash
+        puzzle.recalc_quick_hash = False
+        return quick_hash
 
 
 class Puzzle:
+    __slots__ = (
+        '_colors', '_adj', 'hasher',
+        'recalc_full_hash', 'recalc_quick_hash', 'not_collapsed',
+        '_full_hash', '_quick_hash', '_iso_graph', '_iso_igraph', '_neighbor_cache', '_collapsed',
+    )
+
     @staticmethod
     def set_recalc_full_hash(method):
         def wrapper(self, *args, **kwargs):
@@ -83,11 +147,19 @@ class Puzzle:
             self.recalc_full_hash = True
             self.recalc_quick_hash = True
             self.not_collapsed = True
+            self._quick_hash = None
+            self._iso_graph = None
+            self._iso_igraph = None
+            self._collapsed = None
+            self._neighbor_cache.clear()
             return method(self, *args, **kwargs)
         return wrapper
     
     def __init__(self, hasher: HashTracker | None = None):
-        self.graph = nx.Graph()
+        # the puzzle is stored as plain dicts (rather than an ``nx.Graph``) since it is
+        # copied and modified for every state in a search
+        self._colors: dict[NodeID, InfiniteColor] = {}
+        self._adj: dict[NodeID, set[NodeID]] = {}
         self.hasher = hasher if hasher is not None else HashTracker()
         # whether the puzzle has been modified since last hash computation
         self.recalc_full_hash = True
@@ -96,6 +168,11 @@ class Puzzle:
         self._full_hash: FullHash | None = None
         self._quick_hash: QuickHash | None = None
         self._iso_graph: IsomorphicPuzzleGraph | None = None
+        self._iso_igraph: IsomorphicIGraph | None = None
+        # neighbors of each node, filled in by get_neighbors and cleared whenever the puzzle changes
+        self._neighbor_cache: dict[NodeID, tuple[NodeID, ...]] = {}
+        # collapsed copy returned by collapsed() (only used while the puzzle isn't collapsed itself)
+        self._collapsed: Puzzle | None = None
 
     @property
     def full_hash(self) -> FullHash:
@@ -108,55 +185,128 @@ class Puzzle:
     
     @property
     def quick_hash(self) -> QuickHash:
-        if self.recalc_quick_hash:
-            self._quick_hash, self._iso_graph = self.hasher.quick_hash(self)
-            self.recalc_quick_hash = False
-        assert self._quick_hash is not None
-        return self._quick_hash
+        return self.hasher.quick_hash(self)
     
     @property
     def iso_graph(self) -> IsomorphicPuzzleGraph:
-        if self.recalc_full_hash:
-            self._quick_hash, self._iso_graph = self.hasher.quick_hash(self)
-            self.recalc_quick_hash = False
-        assert self._iso_graph is not None
+        '''The colored digraph of the collapsed puzzle, built on first use.'''
+        if self._iso_graph is None:
+            self._iso_graph = self.collapsed().to_colored_digraph()
         return self._iso_graph
+
+    @property
+    def iso_igraph(self) -> IsomorphicIGraph:
+        '''The colored graph of the collapsed puzzle for igraph, built on first use.'''
+        if self._iso_igraph is None:
+            self._iso_igraph = self.collapsed().to_colored_igraph()
+        return self._iso_igraph
     
     # doesn't modify the structure, but may modify the final hash
     @set_recalc_full_hash
     def set_hasher(self, hasher: HashTracker):
         self.hasher = hasher
     
+    @property
+    def graph(self) -> nx.Graph:
+        '''Return a new ``nx.Graph`` of the puzzle (changes to it don't affect the puzzle).'''
+        graph = nx.Graph()
+        graph.add_nodes_from((node, {_COLOR_KEY: color}) for node, color in self._colors.items())
+        graph.add_edges_from(self.edges)
+        return graph
+
+    @property
+    def nodes(self):
+        return self._colors.keys()
+
+    @property
+    def edges(self) -> list[tuple[NodeID, NodeID]]:
+        '''Return each undirected edge once.'''
+        seen: set[NodeID] = set()
+        edges = []
+        for node, neighbors in self._adj.items():
+            edges.extend((node, neighbor) for neighbor in neighbors if neighbor not in seen)
+            seen.add(node)
+        return edges
+
+    def number_of_edges(self) -> int:
+        return sum(len(neighbors) for neighbors in self._adj.values()) // 2
+
+    def number_of_colors(self) -> int:
+        return len(set(self._colors.values()))
+
+    def degree(self, node_id: NodeID) -> int:
+        return len(self._adj[node_id])
+
     @redo_all
     def add_node(self, node_id: NodeID, color: InfiniteColor):
-        self.graph.add_node(node_id, **{NodeAttributeName.COLOR: color})
+        self._colors[node_id] = color
+        self._adj.setdefault(node_id, set())
     
     @redo_all
     def add_edge(self, node1: NodeID, node2: NodeID):
-        self.graph.add_edge(node1, node2)
+        self._adj[node1].add(node2)
+        self._adj[node2].add(node1)
+
+    @redo_all
+    def add_nodes_from(self, nodes: Iterable[tuple[NodeID, InfiniteColor]]):
+        '''Add each ``(node_id, color)`` pair (the caches are only reset once).'''
+        for node_id, color in nodes:
+            self._colors[node_id] = color
+            self._adj.setdefault(node_id, set())
+
+    @redo_all
+    def add_edges_from(self, edges: Iterable[tuple[NodeID, NodeID]]):
+        '''Add each ``(node1, node2)`` edge (the caches are only reset once).'''
+        adj = self._adj
+        for node1, node2 in edges:
+            adj[node1].add(node2)
+            adj[node2].add(node1)
 
     @redo_all
     def set_color(self, node_id: NodeID, color: InfiniteColor, propagate: bool = True):
-        if propagate:
-            same_color_neighbors = self.get_same_color_neighbors(node_id)
-            for neighbor in same_color_neighbors:
-                self.set_color(neighbor, color, propagate=False)
-        self.graph.nodes[node_id][NodeAttributeName.COLOR] = color
+        '''
+        Set the color of ``node_id``.
+        If ``propagate`` is true, the whole same-color region containing the node is recolored (flood fill).
+        '''
+        colors = self._colors
+        old_color = colors[node_id]
+        colors[node_id] = color
+        # colors are singletons (see ``InfiniteColor``), so they are compared by identity
+        if not propagate or old_color is color:
+            return
+        adj = self._adj
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            for neighbor in adj[current]:
+                # recoloring a node also marks it as visited
+                if colors[neighbor] is old_color:
+                    colors[neighbor] = color
+                    stack.append(neighbor)
     
     def get_color(self, node_id: NodeID) -> InfiniteColor:
-        return self.graph.nodes[node_id][NodeAttributeName.COLOR]
+        return self._colors[node_id]
     
-    def get_neighbors(self, node_id: NodeID):
-        return list(self.graph.neighbors(node_id))
+    def get_neighbors(self, node_id: NodeID) -> tuple[NodeID, ...]:
+        neighbors = self._neighbor_cache.get(node_id)
+        if neighbors is None:
+            neighbors = self._neighbor_cache[node_id] = tuple(self._adj[node_id])
+        return neighbors
     
     def get_same_color_neighbors(self, node_id: NodeID):
-        color = self.get_color(node_id)
-        return [n for n in self.get_neighbors(node_id) if self.get_color(n) == color]
+        colors = self._colors
+        color = colors[node_id]
+        return [n for n in self.get_neighbors(node_id) if colors[n] is color]
 
     @property
     def is_solved(self) -> bool:
-        colors = {self.get_color(node) for node in self.graph.nodes}
-        return len(colors) == 1
+        # stop at the first node whose color differs from the first one
+        colors = iter(self._colors.values())
+        first = next(colors, None)
+        if first is None:
+            # an empty puzzle has no color to be solved to
+            return False
+        return all(color is first for color in colors)
     
     # Doesn't modify the full hash because the graph structure doesn't change
     def collapse(self, node_id: NodeID | None = None) -> None:
@@ -169,58 +319,192 @@ class Puzzle:
             # No need to collapse again if nothing has changed
             return
         
+        adj, colors = self._adj, self._colors
+        # collapsing rewires the adjacency
+        self._neighbor_cache.clear()
+
         def _component(start: NodeID) -> set[NodeID]:
             '''Return the set of nodes in the connected component of the same color as start.'''
-            color = self.get_color(start)
+            color = colors[start]
             stack = [start]
             # short for "component"
-            comp = set()
+            comp = {start}
             while stack:
                 current = stack.pop()
-                if current in comp:
-                    continue
-                if self.get_color(current) != color:
-                    continue
-                comp.add(current)
-                stack.extend(self.get_neighbors(current))
+                # filter before pushing so that only new same-color nodes go on the stack
+                for neighbor in adj[current]:
+                    if neighbor not in comp and colors[neighbor] is color:
+                        comp.add(neighbor)
+                        stack.append(neighbor)
             return comp
 
         def _collapse(start: NodeID, comp: set[NodeID]) -> None:
             '''Collapse the component ``comp`` into a single node with ID ``start``.'''
-            color = self.get_color(start)
             new_neighbors = {
                 neighbor
                 for node in comp
-                for neighbor in self.get_neighbors(node)
+                for neighbor in adj[node]
                 if neighbor not in comp
             }
             for node in comp:
-                self.graph.remove_node(node)
-            self.graph.add_node(start, **{NodeAttributeName.COLOR: color})
+                for neighbor in adj[node]:
+                    if neighbor not in comp:
+                        adj[neighbor].discard(node)
+                if node != start:
+                    del adj[node]
+                    del colors[node]
+            adj[start] = new_neighbors
             for neighbor in new_neighbors:
-                self.graph.add_edge(start, neighbor)
+                adj[neighbor].add(start)
 
         if node_id is not None:
             comp = _component(node_id)
             _collapse(node_id, comp)
             # could still be uncollapsed at this point
         else:
-            visited: set[NodeID] = set()
-            for node in list(self.graph.nodes):
-                if node in visited or node not in self.graph.nodes:
-                    continue
-                comp = _component(node)
-                visited.update(comp)
-                _collapse(node, comp)
+            # union-find over the same-color edges (with path halving)...
+            parent = {node: node for node in adj}
+            for node, neighbors in adj.items():
+                color = colors[node]
+                for neighbor in neighbors:
+                    if colors[neighbor] is not color:
+                        continue
+                    root = node
+                    while parent[root] != root:
+                        parent[root] = root = parent[parent[root]]
+                    other = neighbor
+                    while parent[other] != other:
+                        parent[other] = other = parent[parent[other]]
+                    if root != other:
+                        parent[other] = root
+
+            # ...then rebuild the graph once (if anything needs to be merged)
+            if any(node != rep for node, rep in parent.items()):
+                representative: dict[NodeID, NodeID] = {}
+                for node in adj:
+                    root = node
+                    while parent[root] != root:
+                        root = parent[root]
+                    representative[node] = root
+                new_adj: dict[NodeID, set[NodeID]] = {
+                    node: set() for node, rep in representative.items() if node == rep
+                }
+                for node, neighbors in adj.items():
+                    rep = representative[node]
+                    rep_neighbors = new_adj[rep]
+                    for neighbor in neighbors:
+                        neighbor_rep = representative[neighbor]
+                        if neighbor_rep != rep:
+                            rep_neighbors.add(neighbor_rep)
+                self._colors = {node: colors[node] for node in new_adj}
+                self._adj = new_adj
             # all components collapsed
             self.not_collapsed = False
 
+    def recolor(self, node_id: NodeID, color: InfiniteColor) -> None:
+        '''
+        Flood ``node_id``'s region with ``color`` and collapse the puzzle.
+
+        Same as ``set_color(node_id, color)`` followed by ``collapse()``, but if the puzzle is
+        already collapsed only the recolored node and its neighbors are touched.
+        '''
+        if self.not_collapsed:
+            self.set_color(node_id, color, propagate=True)
+            self.collapse()
+        else:
+            self._merge_neighbors(node_id, color)
+
+    @redo_all
+    def _merge_neighbors(self, node_id: NodeID, color: InfiniteColor) -> None:
+        '''Recolor ``node_id`` of a collapsed puzzle and merge its neighbors of that color into it.'''
+        adj, colors = self._adj, self._colors
+        colors[node_id] = color
+        # neighbors can't share a color in a collapsed puzzle, so the only new region is
+        # ``node_id`` together with its neighbors of the new color
+        merged = {neighbor for neighbor in adj[node_id] if colors[neighbor] is color}
+        if merged:
+            new_neighbors = adj[node_id]
+            new_neighbors -= merged
+            for node in merged:
+                for neighbor in adj.pop(node):
+                    if neighbor != node_id:
+                        neighbor_adj = adj[neighbor]
+                        neighbor_adj.discard(node)
+                        neighbor_adj.add(node_id)
+                        new_neighbors.add(neighbor)
+                del colors[node]
+        # the merged region's neighbors all have other colors, so the puzzle stays collapsed
+        self.not_collapsed = False
+
+
+    def collapsed(self) -> "Puzzle":
+        '''
+        Return this puzzle if it is already collapsed, otherwise a collapsed copy of it.
+
+        The copy is cached until the puzzle is modified, so it must not be modified either.
+        '''
+        if not self.not_collapsed:
+            return self
+        if self._collapsed is None:
+            self._collapsed = self.copy()
+            self._collapsed.collapse()
+        return self._collapsed
+
+    def _invariant(self) -> PuzzleInvariant:
+        '''Return the sorted degree sequence and sorted color class sizes (invariant under isomorphism).'''
+        class_size: dict[InfiniteColor, int] = {}
+        for color in self._colors.values():
+            class_size[color] = class_size.get(color, 0) + 1
+        return (
+            tuple(sorted(len(neighbors) for neighbors in self._adj.values())),
+            tuple(sorted(class_size.values())),
+        )
+
+    def _structural_digest(self, rounds: int = 3) -> QuickHash:
+        """
+        Return a digest of the graph structure that is invariant under isomorphism.
+
+        Node labels start as degrees and are refined ``rounds`` times using the labels of
+        the node's neighbors and of the other nodes in its color class. Colors only enter
+        through the members of their class (never through their value), so puzzles that only
+        differ by a permutation of the colors get the same digest, matching the isomorphism
+        used by :meth:`to_colored_digraph`.
+
+        The refinement runs on lists indexed by position (nodes are ``0..N-1`` and color
+        classes ``0..C-1``), and the result is Python's ``hash`` of the signature, which is
+        deterministic for tuples of ints.
+        """
+        adj, colors = self._adj, self._colors
+        index = {v: i for i, v in enumerate(adj)}
+        neighbors = [[index[w] for w in adj[v]] for v in adj]
+        class_index: dict[InfiniteColor, int] = {}
+        classes = [class_index.setdefault(colors[v], len(class_index)) for v in adj]
+        labels = [len(node_neighbors) for node_neighbors in neighbors]
+        # signatures seen in each round
+        history = []
+        for _ in range(rounds):
+            class_members: list[list[int]] = [[] for _ in class_index]
+            for cls, label in zip(classes, labels):
+                class_members[cls].append(label)
+            class_label = [tuple(sorted(members)) for members in class_members]
+            # short for "signatures"
+            sigs = [
+                (label, class_label[cls], tuple(sorted([labels[w] for w in node_neighbors])))
+                for label, cls, node_neighbors in zip(labels, classes, neighbors)
+            ]
+            round_sigs = sorted(set(sigs))
+            history.append(tuple(round_sigs))
+            # compress the signatures to small ints so the next round stays cheap
+            compressed = {sig: i for i, sig in enumerate(round_sigs)}
+            labels = [compressed[sig] for sig in sigs]
+        signature = (tuple(history), tuple(sorted(labels)))
+        return format(hash(signature) & 0xFFFFFFFFFFFFFFFF, '016x')
 
     def to_colored_digraph(self: "Puzzle") -> IsomorphicPuzzleGraph:
         """
         Return a new DiGraph with two kinds of nodes:
-        kind = "v"  : original puzzle vertex
-        kind = "c"  : one node per *color class*
+        kind = "v"  : original puzzle vertex (numbered ``0..N-1``)
+        kind = "c"  : one node per *color class* (numbered ``N..N+C-1``)
 
         Edges:
         c  →  v       if v has that color
@@ -229,44 +513,78 @@ class Puzzle:
         This representation makes it so that graphs with the same structure with regards to connections and coloring are isomorphic.
         """
         G = nx.DiGraph()
+        colors = self._colors
+        # contiguous int IDs are cheaper to hash than ("v", v) / ("c", col) tuples
+        index = {v: i for i, v in enumerate(colors)}
+        num_nodes = len(index)
+        color_index: dict[InfiniteColor, int] = {}
+        for col in colors.values():
+            color_index.setdefault(col, num_nodes + len(color_index))
 
         # 1. add vertex nodes
-        for v in self.graph.nodes:
-            G.add_node(("v", v), kind="v")          # tuple keeps IDs distinct
-
-        # 2. add one color node per color value
-        color_to_node = {}
-        for v in self.graph.nodes:
-            col = self.get_color(v)
-            if col not in color_to_node:
-                color_to_node[col] = ("c", col)    # keep Enum for uniqueness
-                G.add_node(("c", col), kind="c")
+        G.add_nodes_from(range(num_nodes), kind="v")
 
-            G.add_edge(("c", col), ("v", v))        # color  →  vertex
+        # 2. add one color node per color class
+        G.add_nodes_from(color_index.values(), kind="c")
+        G.add_edges_from((color_index[col], index[v]) for v, col in colors.items())  # color  →  vertex
 
         # 3. add bidirectional edges for the puzzle links
-        for u, w in self.graph.edges:
-            G.add_edge(("v", u), ("v", w))
-            G.add_edge(("v", w), ("v", u))
+        # (the adjacency lists each undirected edge once from either end)
+        G.add_edges_from((index[u], index[w]) for u, neighbors in self._adj.items() for w in neighbors)
 
         return G
 
+    def to_colored_igraph(self) -> IsomorphicIGraph:
+        """
+        Return the graph from :meth:`to_colored_digraph` as an igraph graph and its vertex kinds.
+
+        Puzzle nodes are numbered ``0..N-1`` and color class nodes ``N..N+C-1``.
+        """
+        # imported again here so that a missing optional dependency raises ImportError
+        import igraph
+
+        index = {v: i for i, v in enumerate(self._colors)}
+        num_nodes = len(index)
+        color_index: dict[InfiniteColor, int] = {}
+        # color class → vertex
+        edges = [
+            (color_index.setdefault(col, num_nodes + len(color_index)), index[v])
+            for v, col in self._colors.items()
+        ]
+        # vertex  ↔  vertex (the adjacency lists each undirected edge once from either end)
+        for u, neighbors in self._adj.items():
+            i = index[u]
+            edges.extend((i, index[w]) for w in neighbors)
+        # ``GraphBase`` skips ``Graph.__init__``, which tries to import numpy on every call
+        graph = igraph.GraphBase(num_nodes + len(color_index), edges, directed=True)
+        return graph, [0] * num_nodes + [1] * len(color_index)
+
+    def _certificate(self) -> PuzzleCertificate:
+        '''Return the canonical form of :attr:`iso_igraph` (computed by igraph's BLISS).'''
+        graph, kinds = self.iso_igraph
+        canonical = graph.permute_vertices(graph.canonical_permutation(color=kinds))
+        # the kinds can be read off the edges (only color class nodes have no incoming edges),
+        # so the sorted edge list is enough
+        return tuple(sorted(canonical.get_edgelist()))
+
     def copy(self) -> "Puzzle":
         new_puzzle = Puzzle(self.hasher)
-        # don't need deep copy since there are no nested structures
-        new_puzzle.graph = self.graph.copy()
+        new_puzzle._colors = self._colors.copy()
+        new_puzzle._adj = {node: neighbors.copy() for node, neighbors in self._adj.items()}
         new_puzzle.recalc_full_hash = self.recalc_full_hash
         new_puzzle.recalc_quick_hash = self.recalc_quick_hash
         new_puzzle.not_collapsed = self.not_collapsed
         new_puzzle._full_hash = self._full_hash
         new_puzzle._quick_hash = self._quick_hash
         new_puzzle._iso_graph = self._iso_graph
+        new_puzzle._iso_igraph = self._iso_igraph
+        new_puzzle._collapsed = self._collapsed
         return new_puzzle
 
     def display_graph(self):
-        for node in self.graph.nodes:
+        for node in self.nodes:
             color = self.get_color(node)
-            neighbors = self.get_neighbors(node)
+            neighbors = list(self.get_neighbors(node))
             print(f'Node {node}: Color {color.name}, Neighbors {neighbors}')
 
     def __str__(self) -> str:
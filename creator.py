@@ -1,5 +1,7 @@
 """Utilities for generating challenging Kami puzzles."""
+import functools
 import itertools
+from concurrent.futures import ProcessPoolExecutor
 from typing import Iterable, List, Tuple
 
 import networkx as nx
@@ -10,75 +12,206 @@ from solver import SolvablePuzzle, Move, HeuristicName, HashTracker
 
 
 Coloring = Tuple[InfiniteColor, ...]
+Edge = Tuple[int, int]
 
 
-def _all_graphs(n: int) -> Iterable[nx.Graph]:
-    """Yield all simple graphs with ``n`` nodes."""
+def _is_connected(adjacency: List[int]) -> bool:
+    """Return ``True`` if the graph given by per-node neighbor bitmasks is connected."""
+    everything = (1 << len(adjacency)) - 1
+    reached = frontier = 1
+    while frontier:
+        neighbors = 0
+        while frontier:
+            low_bit = frontier & -frontier
+            neighbors |= adjacency[low_bit.bit_length() - 1]
+            frontier ^= low_bit
+        frontier = neighbors & ~reached
+        reached |= frontier
+    return reached == everything
+
+
+def _all_graphs(n: int, connected: bool = False) -> Iterable[nx.Graph]:
+    """
+    Yield all simple graphs with ``n`` nodes.
+    If ``connected`` is ``True``, only connected graphs are yielded
+    (this is checked on bitmasks before any ``nx.Graph`` is built).
+    """
     nodes = list(range(n))
     edges = list(itertools.combinations(nodes, 2))
     # lower smoothing (EMA) so that time estimates are more accurate throughout jitters
     for mask in tqdm(range(1 << len(edges)), desc="All graphs", unit="graph", smoothing=0.05):
+        present = [edge for i, edge in enumerate(edges) if mask >> i & 1]
+        if connected:
+            adjacency = [0] * n
+            for u, v in present:
+                adjacency[u] |= 1 << v
+                adjacency[v] |= 1 << u
+            if not _is_connected(adjacency):
+                continue
         g = nx.Graph()
         g.add_nodes_from(nodes)
-        for i, (u, v) in enumerate(edges):
-            if mask & (1 << i):
-                g.add_edge(u, v)
+        g.add_edges_from(present)
         yield g
 
 
-def _all_colorings(n: int, colors: List[InfiniteColor]) -> Iterable[Coloring]:
-    """Yield all assignments of ``colors`` to ``n`` nodes."""
-    for prod in tqdm(itertools.product(colors, repeat=n), desc="All colorings", unit="coloring", total=len(colors)**n, leave=False):
+def _non_isomorphic(graphs: Iterable[nx.Graph]) -> Iterable[nx.Graph]:
+    """Yield the first graph of each isomorphism class in ``graphs``."""
+    # graphs seen so far, bucketed by the sorted (degree, sorted neighbor degrees) of their nodes
+    seen: dict[tuple[tuple[int, tuple[int, ...]], ...], list[nx.Graph]] = {}
+    for g in graphs:
+        degree = dict(g.degree)
+        key = tuple(sorted(
+            (degree[node], tuple(sorted(degree[neighbor] for neighbor in g[node])))
+            for node in g
+        ))
+        bucket = seen.setdefault(key, [])
+        if any(nx.is_isomorphic(g, other) for other in bucket):
+            continue
+        bucket.append(g)
+        yield g
+
+
+def _is_planar(g: nx.Graph) -> bool:
+    """Return ``True`` if ``g`` is planar, skipping the full planarity test when edge counts settle it."""
+    n = g.number_of_nodes()
+    if n < 3:
+        return True
+    # planar graphs with at least 3 nodes have at most 3n - 6 edges (Euler's formula)
+    if g.number_of_edges() > 3 * n - 6:
+        return False
+    # the only non-planar graph on at most 5 nodes is K5, which has too many edges
+    if n <= 5:
+        return True
+    return nx.check_planarity(g)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _planar_graphs(n: int) -> Tuple[nx.Graph, ...]:
+    """
+    Return one connected planar graph on ``n`` nodes per isomorphism class.
+
+    The result only depends on ``n``, so it is cached (callers must not modify the graphs).
+    """
+    # isomorphic graphs give the same puzzles up to relabeling, so only one of each is needed
+    return tuple(g for g in _non_isomorphic(_all_graphs(n, connected=True)) if _is_planar(g))
+
+
+def _num_colorings(n: int, k: int) -> int:
+    """Return the number of ways to split ``n`` nodes into at most ``k`` color classes."""
+    # ways[j] = number of ways to split the nodes so far into exactly j classes (Stirling numbers)
+    ways = [1] + [0] * k
+    for _ in range(n):
+        ways = [0] + [j * ways[j] + ways[j - 1] for j in range(1, k + 1)]
+    return sum(ways)
+
+
+def _all_colorings(n: int, colors: List[InfiniteColor], progress: bool = True) -> Iterable[Coloring]:
+    """
+    Yield all assignments of ``colors`` to ``n`` nodes, up to renaming the colors.
+
+    Every color is interchangeable in a puzzle, so only canonical colorings are yielded:
+    a color is never used before all the colors that come before it in ``colors``.
+    """
+    coloring: List[InfiniteColor] = []
+
+    def _extend(used: int) -> Iterable[Coloring]:
+        if len(coloring) == n:
+            yield tuple(coloring)
+            return
+        # any color already used, or the next unused one
+        for i in range(min(used + 1, len(colors))):
+            coloring.append(colors[i])
+            yield from _extend(max(used, i + 1))
+            coloring.pop()
+
+    total = _num_colorings(n, len(colors))
+    for prod in tqdm(_extend(0), desc="All colorings", unit="coloring", total=total, leave=False, disable=not progress):
         yield prod
 
 
-def _create_puzzle(g: nx.Graph, coloring: Coloring, valid_colors: List[InfiniteColor], hasher: HashTracker | None) -> SolvablePuzzle:
+def _create_puzzle(edges: Iterable[Edge], coloring: Coloring, valid_colors: List[InfiniteColor], hasher: HashTracker | None) -> SolvablePuzzle:
     puzzle = SolvablePuzzle(hasher=hasher, valid_colors=set(valid_colors))
-    for node, color in enumerate(coloring):
-        puzzle.add_node(node, color)
-    for u, v in g.edges:
-        puzzle.add_edge(u, v)
+    puzzle.add_nodes_from(enumerate(coloring))
+    puzzle.add_edges_from(edges)
     return puzzle
 
 
-def hardest_puzzle(n: int, k: int, fuzzy: bool = False) -> tuple[SolvablePuzzle | None, List[Move] | None]:
+def _hardest_coloring(
+    n: int,
+    edges: List[Edge],
+    colors: List[InfiniteColor],
+    fuzzy: bool,
+    seen: set[str],
+    hasher: HashTracker | None = None,
+    progress: bool = True,
+) -> tuple[Coloring | None, List[Move] | None]:
+    """
+    Return the coloring of the ``n``-node graph given by ``edges`` needing the most moves, and its solution.
+    ``seen`` holds the quick hashes of puzzles already tried (only used if ``fuzzy`` is ``True``).
+    """
+    max_moves = -1
+    best_coloring: Coloring | None = None
+    best_solution: List[Move] | None = None
+
+    for coloring in _all_colorings(n, colors, progress=progress):
+        puzzle = _create_puzzle(edges, coloring, colors, hasher)
+        if fuzzy:
+            quick_hash = puzzle.quick_hash
+            if quick_hash in seen:
+                continue
+            seen.add(quick_hash)
+
+        # solution = puzzle.a_star_solve([heuristic for heuristic in HeuristicName])
+        # solution = puzzle.a_star_solve([HeuristicName.COLOR])
+        solution = puzzle.a_star_solve([HeuristicName.MAX_EDGE_REDUCTION])
+        # solution = puzzle.bfs_solve(progress=False)
+
+        if solution is not None and len(solution) > max_moves:
+            max_moves = len(solution)
+            best_coloring = coloring
+            best_solution = solution
+
+    return best_coloring, best_solution
+
+
+def hardest_puzzle(n: int, k: int, fuzzy: bool = False, workers: int | None = None) -> tuple[SolvablePuzzle | None, List[Move] | None]:
     """
     Return the planar puzzle needing the most moves for ``n`` nodes and ``k`` colors.
     If ``fuzzy`` is ``True``, use quick hash to avoid duplicate puzzles.
     (This may miss some puzzles.)
+    If ``workers`` is more than 1, the graphs are split across that many processes.
+    (With ``fuzzy``, each graph then only skips duplicates of its own puzzles.)
     """
 
-    colors = list(InfiniteColor)[:k]
+    colors = InfiniteColor.create_range(k)
     max_moves = -1
     best_puzzle: SolvablePuzzle | None = None
     best_solution: List[Move] | None = None
     hasher = None # each puzzle gets its own hasher
     # hasher = HashTracker()
-    seen = set()
+    seen: set[str] = set()
 
-    for g in _all_graphs(n):
-        if not nx.is_connected(g):
-            continue
-        is_planar, _ = nx.check_planarity(g)
-        if not is_planar:
-            continue
-        for coloring in _all_colorings(n, colors):
-            puzzle = _create_puzzle(g, coloring, colors, hasher)
-            if fuzzy:
-                quick_hash = puzzle.quick_hash
-                if quick_hash in seen:
-                    continue
-                seen.add(quick_hash)
-
-            # solution = puzzle.a_star_solve([heuristic for heuristic in HeuristicName])
-            # solution = puzzle.a_star_solve([HeuristicName.COLOR])
-            solution = puzzle.a_star_solve([HeuristicName.MAX_EDGE_REDUCTION])
-            # solution = puzzle.bfs_solve(progress=False)
-
-            if solution is not None and len(solution) > max_moves:
-                max_moves = len(solution)
-                best_puzzle = puzzle
-                best_solution = solution
+    graph_edges = [list(g.edges) for g in _planar_graphs(n)]
+    if workers is None or workers <= 1:
+        results: Iterable[tuple[Coloring | None, List[Move] | None]] = (
+            _hardest_coloring(n, edges, colors, fuzzy, seen, hasher) for edges in graph_edges
+        )
+    else:
+        # only edge lists, colorings and moves cross process boundaries (no puzzles or graphs)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(tqdm(
+                executor.map(
+                    functools.partial(_hardest_coloring, n, colors=colors, fuzzy=fuzzy, seen=seen, progress=False),
+                    graph_edges,
+                ),
+                desc="Graphs", unit="graph", total=len(graph_edges),
+            ))
+
+    for edges, (coloring, solution) in zip(graph_edges, results):
+        if coloring is not None and solution is not None and len(solution) > max_moves:
+            max_moves = len(solution)
+            best_puzzle = _create_puzzle(edges, coloring, colors, hasher)
+            best_solution = solution
 
     return best_puzzle, best_solution
 
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+
 from typing import (
     Any, Dict, Self, Generic, Hashable, Iterable, List, Optional,
     Protocol, TypeVar, runtime_checkable
@@ -21,6 +24,8 @@ class AddableComparable(Protocol):
 
 @runtime_checkable
 class HeapItem(Protocol[GenericName, GenericCost]):
+    # empty so that slotted implementations (e.g. SolutionHeapItem) don't get a __dict__
+    __slots__ = ()
     name: GenericName
     cost: GenericCost
 
@@ -29,88 +34,147 @@ ItemT = TypeVar("ItemT", bound=HeapItem[Any, Any])
 # ────────────────────────────
 #  Min-heap implementation
 # ────────────────────────────
+# marks a heap entry whose item has been replaced by a later add_or_update
+_REMOVED: Any = object()
+
 class MinHeap(Generic[GenericName, GenericCost, ItemT]):
-    """Array-backed min-heap keyed by .cost and addressed by .name."""
+    """
+    Min-heap keyed by .cost and addressed by .name.
 
-    __slots__ = ("_heap", "_pos")
+    The sifting is done by :mod:`heapq` (in C). Updating an item pushes a new
+    entry and marks the old one as removed; removed entries are skipped when
+    they reach the top ("lazy deletion").
+    """
+
+    __slots__ = ("_heap", "_entries", "_counter")
 
     # ── construction ──
     def __init__(self, items: Optional[Iterable[ItemT]] = None) -> None:
-        self._heap: List[ItemT] = []
-        self._pos: Dict[GenericName, int] = {}
+        # entries are [cost, insertion count, item] so ties never compare items
+        self._heap: List[List[Any]] = []
+        self._entries: Dict[GenericName, List[Any]] = {}
+        self._counter = itertools.count()
         if items:
             for o in items:
-                self._pos[o.name] = len(self._heap)
-                self._heap.append(o)
-            for i in reversed(range(len(self._heap) // 2)):
-                self._sift_down(i)
+                self._replace(o)
+                entry = [o.cost, next(self._counter), o]
+                self._entries[o.name] = entry
+                self._heap.append(entry)
+            heapq.heapify(self._heap)
 
     # ── public API ──
     def add_or_update(self, obj: ItemT) -> None:
-        idx = self._pos.get(obj.name)
-        if idx is None:                       # insert
-            idx = len(self._heap)
-            self._heap.append(obj)
-            self._pos[obj.name] = idx
-            self._sift_up(idx)
-        else:                                 # update existing
-            old = self._heap[idx]
-            self._heap[idx] = obj
-            if obj.cost < old.cost:
-                self._sift_up(idx)
-            elif obj.cost > old.cost:
-                self._sift_down(idx)
+        self._replace(obj)
+        entry = [obj.cost, next(self._counter), obj]
+        self._entries[obj.name] = entry
+        heapq.heappush(self._heap, entry)
 
     def pop(self) -> ItemT:
-        if not self._heap:
+        heap = self._heap
+        while heap:
+            item = heapq.heappop(heap)[2]
+            if item is not _REMOVED:
+                del self._entries[item.name]
+                return item
+        raise IndexError("pop from empty heap")
+
+    def peek(self) -> Optional[ItemT]:
+        heap = self._heap
+        while heap and heap[0][2] is _REMOVED:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._entries.clear()
+
+    # Pythonic helpers
+    def __len__(self) -> int:          # len(heap)
+        return len(self._entries)
+
+    def __bool__(self) -> bool:        # bool(heap)
+        return bool(self._entries)
+
+    # ── internal helpers ──
+    def _replace(self, obj: ItemT) -> None:
+        """Mark the entry currently holding ``obj.name`` (if any) as removed."""
+        old = self._entries.get(obj.name)
+        if old is not None:
+            old[2] = _REMOVED
+
+# ────────────────────────────
+#  Bucket queue implementation
+# ────────────────────────────
+class BucketMinHeap(Generic[GenericName, GenericCost, ItemT]):
+    """
+    Min-heap for small non-negative integer costs (a "bucket queue").
+
+    Items are appended to the bucket of their cost, so pushing and popping never
+    compare costs. Items with the same cost are popped last in, first out.
+    Updates use lazy deletion, as in :class:`MinHeap`.
+    """
+
+    __slots__ = ("_buckets", "_entries", "_min")
+
+    # ── construction ──
+    def __init__(self, items: Optional[Iterable[ItemT]] = None) -> None:
+        # _buckets[cost] holds [item] entries (the item is replaced by _REMOVED when updated)
+        self._buckets: List[List[List[Any]]] = []
+        self._entries: Dict[GenericName, List[Any]] = {}
+        # no live item has a cost below this
+        self._min = 0
+        if items:
+            for o in items:
+                self.add_or_update(o)
+
+    # ── public API ──
+    def add_or_update(self, obj: ItemT) -> None:
+        old = self._entries.get(obj.name)
+        if old is not None:
+            old[0] = _REMOVED
+        cost: int = obj.cost
+        buckets = self._buckets
+        while len(buckets) <= cost:
+            buckets.append([])
+        entry = [obj]
+        buckets[cost].append(entry)
+        self._entries[obj.name] = entry
+        if cost < self._min:
+            self._min = cost
+
+    def pop(self) -> ItemT:
+        bucket = self._top_bucket()
+        if bucket is None:
             raise IndexError("pop from empty heap")
-        top: ItemT = self._heap[0]
-        last: ItemT = self._heap.pop()
-        del self._pos[top.name]
-        if self._heap:
-            self._heap[0] = last
-            self._pos[last.name] = 0
-            self._sift_down(0)
-        return top
+        item = bucket.pop()[0]
+        del self._entries[item.name]
+        return item
 
     def peek(self) -> Optional[ItemT]:
-        return self._heap[0] if self._heap else None
+        bucket = self._top_bucket()
+        return bucket[-1][0] if bucket is not None else None
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._entries.clear()
+        self._min = 0
 
     # Pythonic helpers
     def __len__(self) -> int:          # len(heap)
-        return len(self._heap)
+        return len(self._entries)
 
     def __bool__(self) -> bool:        # bool(heap)
-        return bool(self._heap)
-
-    # ── internal sift helpers ──
-    def _sift_up(self, idx: int) -> None:
-        heap, pos = self._heap, self._pos
-        item = heap[idx]
-        while idx:
-            parent = (idx - 1) >> 1
-            if item.cost >= heap[parent].cost:
-                break
-            heap[idx] = heap[parent]
-            pos[heap[parent].name] = idx
-            idx = parent
-        heap[idx] = item
-        pos[item.name] = idx
-
-    def _sift_down(self, idx: int) -> None:
-        heap, pos = self._heap, self._pos
-        size = len(heap)
-        item = heap[idx]
-        while True:
-            left = (idx << 1) + 1
-            if left >= size:
-                break
-            right = left + 1
-            smaller = right if right < size and heap[right].cost < heap[left].cost else left
-            if heap[smaller].cost >= item.cost:
-                break
-            heap[idx] = heap[smaller]
-            pos[heap[smaller].name] = idx
-            idx = smaller
-        heap[idx] = item
-        pos[item.name] = idx
+        return bool(self._entries)
+
+    # ── internal helpers ──
+    def _top_bucket(self) -> Optional[List[List[Any]]]:
+        """Return the lowest-cost bucket, with a live entry at its end (or ``None`` if empty)."""
+        buckets = self._buckets
+        while self._min < len(buckets):
+            bucket = buckets[self._min]
+            while bucket and bucket[-1][0] is _REMOVED:
+                bucket.pop()
+            if bucket:
+                return bucket
+            self._min += 1
+        return None
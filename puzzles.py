@@ -16,11 +16,12 @@ puzzles: dict[PuzzleName, SolvablePuzzle] = {}
 def add_puzzle(name, section_to_color: dict[NodeID, InfiniteColor], touching: dict[NodeID, list[NodeID]]):
     global puzzles
     puzzle = SolvablePuzzle(valid_colors=set(section_to_color.values()))
-    for section, color in section_to_color.items():
-        puzzle.add_node(section, color)
-    for section, neighbors in touching.items():
-        for neighbor in neighbors:
-            puzzle.add_edge(section, neighbor)
+    # sections are stored as plain ints: int-valued Enum members hash through the Python-level
+    # ``Enum.__hash__``, and solutions can still be mapped back with ``Pz_..._Section(node)``
+    puzzle.add_nodes_from((int(section), color) for section, color in section_to_color.items())
+    puzzle.add_edges_from(
+        (int(section), int(neighbor)) for section, neighbors in touching.items() for neighbor in neighbors
+    )
 
     # Ensure that all the sections are connected
     assert nx.is_connected(puzzle.graph), f"Puzzle {name} is not connected"
@@ -1,8 +1,7 @@
 '''Classes for solving problems that can be modeled as a directed graph with goal nodes'''
 from dataclasses import dataclass
-from collections import deque
-from typing import Callable, Iterable, Deque, Hashable, Generic, TypeVar
-from minheap import HeapItem, MinHeap, GenericCost
+from typing import Any, Callable, Iterable, Hashable, Generic, TypeVar
+from minheap import HeapItem, MinHeap, BucketMinHeap, GenericCost
 
 from tqdm import tqdm
 
@@ -14,6 +13,8 @@ GenericInfo = TypeVar('GenericInfo')
 GenericName = TypeVar('GenericName', bound=Hashable)
 # representation of the action
 GenericMove = TypeVar('GenericMove')
+# moves leading to a node, newest first: (last move, link of the parent), or None at the start
+PathLink = tuple[Any, "PathLink"] | None
 
 class NodeSolver(Generic[GenericInfo, GenericName, GenericMove]):
     '''Class for modeling problems that can be modeled as a directed graph with goal nodes'''
@@ -61,83 +62,97 @@ class BFSSolver(NodeSolver[GenericInfo, GenericName, GenericMove]):
             return self._solve_with_progress(start_info)
         return self._solve_without_progress(start_info)
 
+    @staticmethod
+    def _reconstruct_path(link: PathLink, last_move: GenericMove) -> list[GenericMove]:
+        """Return the moves along ``link`` (from the start), followed by ``last_move``."""
+        path = [last_move]
+        while link is not None:
+            move, link = link
+            path.append(move)
+        path.reverse()
+        return path
+
     def _solve_without_progress(
         self, start_info: GenericInfo
     ) -> list[GenericMove] | None:
         """Standard BFS without progress bars."""
-        if self.is_goal(start_info):
+        namer, detector = self.get_name, self.is_goal
+        expander, follower = self.get_moves, self.follow_move
+        if detector(start_info):
             return []
 
-        start_name = self.get_name(start_info)
+        start_name = namer(start_info)
 
-        name_to_data: dict[GenericName, tuple[GenericInfo, list[GenericMove]]] = {
-            start_name: (start_info, [])
-        }
-        queue: Deque[GenericName] = deque([start_name])
+        # each frontier entry carries its path as a shared linked list of moves,
+        # so a child only adds one (move, parent link) pair to its parent's path
+        # (infos only live in the frontiers, so earlier depths can be freed)
+        seen: set[GenericName] = {start_name}
+        # the BFS runs one depth at a time, so plain lists replace a queue
+        frontier: list[tuple[GenericInfo, PathLink]] = [(start_info, None)]
 
-        while queue:
-            current_name = queue.popleft()
-            current_info, current_path = name_to_data[current_name]
+        while frontier:
+            next_frontier: list[tuple[GenericInfo, PathLink]] = []
+            for current_info, current_link in frontier:
+                for move in expander(current_info):
+                    child_info = follower(current_info, move)
 
-            expanded_moves = self.get_moves(current_info)
-            for move in expanded_moves:
-                child_info = self.follow_move(current_info, move)
-                child_path = current_path + [move]
+                    # a child that was already seen can't be a goal (it would have ended the search)
+                    child_name = namer(child_info)
+                    if child_name in seen:
+                        continue
 
-                if self.is_goal(child_info):
-                    return child_path
+                    if detector(child_info):
+                        return self._reconstruct_path(current_link, move)
 
-                child_name = self.get_name(child_info)
-                if child_name not in name_to_data:
-                    name_to_data[child_name] = (child_info, child_path)
-                    queue.append(child_name)
+                    seen.add(child_name)
+                    next_frontier.append((child_info, (move, current_link)))
+            frontier = next_frontier
         return None
 
     def _solve_with_progress(
         self, start_info: GenericInfo
     ) -> list[GenericMove] | None:
         """BFS with layer-wise tqdm progress bars."""
-        if self.is_goal(start_info):
+        namer, detector = self.get_name, self.is_goal
+        expander, follower = self.get_moves, self.follow_move
+        if detector(start_info):
             return []
 
-        start_name = self.get_name(start_info)
+        start_name = namer(start_info)
 
-        name_to_data: dict[GenericName, tuple[GenericInfo, list[GenericMove]]] = {
-            start_name: (start_info, [])
-        }
-        queue: Deque[GenericName] = deque([start_name])
+        seen: set[GenericName] = {start_name}
+        frontier: list[tuple[GenericInfo, PathLink]] = [(start_info, None)]
         depth = 0
 
-        while queue:
-            layer_size = len(queue)
-            bar = tqdm(total=layer_size, desc=f"Depth {depth}", leave=True)
+        while frontier:
+            next_frontier: list[tuple[GenericInfo, PathLink]] = []
+            bar = tqdm(total=len(frontier), desc=f"Depth {depth}", leave=True)
 
-            for _ in range(layer_size):
-                current_name = queue.popleft()
-                current_info, current_path = name_to_data[current_name]
+            for current_info, current_link in frontier:
+                for move in expander(current_info):
+                    child_info = follower(current_info, move)
 
-                moves = list(self.get_moves(current_info))
-                for move in moves:
-                    child_info = self.follow_move(current_info, move)
-                    child_path = current_path + [move]
+                    child_name = namer(child_info)
+                    if child_name in seen:
+                        continue
 
-                    if self.is_goal(child_info):
+                    if detector(child_info):
                         bar.close()
-                        return child_path
+                        return self._reconstruct_path(current_link, move)
 
-                    child_name = self.get_name(child_info)
-                    if child_name not in name_to_data:
-                        name_to_data[child_name] = (child_info, child_path)
-                        queue.append(child_name)
+                    seen.add(child_name)
+                    next_frontier.append((child_info, (move, current_link)))
 
                 bar.update(1)
 
             bar.close()
+            frontier = next_frontier
             depth += 1
 
         return None
 
-@dataclass
+# slots: one item is created for every pushed state
+@dataclass(slots=True)
 class SolutionHeapItem(
     HeapItem[GenericName, GenericCost],
     Generic[GenericName, GenericCost, GenericInfo]
@@ -153,7 +168,12 @@ class AStarSolver(
     NodeSolver[GenericInfo, GenericName, GenericMove],
     Generic[GenericInfo, GenericName, GenericMove, GenericCost]
 ):
-    """Extremely efficient A* (min-heap, O(E log V))."""
+    """
+    Extremely efficient A* (min-heap, O(E log V)).
+
+    Pass ``f_is_integer=True`` when every cost and heuristic value is a small
+    non-negative int: the open list is then a bucket queue (O(1) push and pop).
+    """
 
     def __init__(
         self,
@@ -163,7 +183,8 @@ class AStarSolver(
         follower:   Callable[[GenericInfo, GenericMove], GenericInfo],
         heuristic:  Callable[[GenericInfo], GenericCost],
         cost: Callable[[GenericInfo, GenericMove, GenericInfo], GenericCost],
-        init_cost: GenericCost # initial cost for the start node (usually 0)
+        init_cost: GenericCost, # initial cost for the start node (usually 0)
+        f_is_integer: bool = False
     ) -> None:
         super().__init__(namer, detector, expander, follower)
         self.heuristic = heuristic
@@ -173,7 +194,11 @@ class AStarSolver(
             GenericName, GenericCost,
             SolutionHeapItem[GenericName, GenericCost,
                              GenericInfo]
-        ] = MinHeap()
+        ] | BucketMinHeap[
+            GenericName, GenericCost,
+            SolutionHeapItem[GenericName, GenericCost,
+                             GenericInfo]
+        ] = BucketMinHeap() if f_is_integer else MinHeap()
 
         # internal tables (allocated per call in `solve`)
         self._g: dict[GenericName, GenericCost]                         # cost so far
@@ -193,52 +218,44 @@ class AStarSolver(
         heap = self.heap
 
         # ── initialise ────────────────────────────────────────────────────
+        # the heap outlives each call, so drop whatever an earlier solve left in it
+        heap.clear()
         start_name: GenericName = namer(start_info)
-        self._g = {start_name: self.init_cost}
-        self._parent = {}
+        g = self._g = {start_name: self.init_cost}
+        parent = self._parent = {}
 
-        f_start: GenericCost = self._g[start_name] + heuristic(start_info)
-        heap.add_or_update(SolutionHeapItem(
-            name=start_name,
-            cost=f_start,
-            info=start_info,
-        ))
+        f_start: GenericCost = g[start_name] + heuristic(start_info)
+        heap.add_or_update(SolutionHeapItem(start_name, f_start, start_info))
 
         closed: set[GenericName] = set()
 
         # ── main loop ─────────────────────────────────────────────────────
         while heap:
             node = heap.pop()                 # node with smallest f
-            name = node.name
+            name, info = node.name, node.info
 
-            if detector(node.info):           # goal reached
+            if detector(info):                # goal reached
                 return self._reconstruct_path(name)
 
             closed.add(name)
-            g_curr: GenericCost = self._g[name]
+            g_curr: GenericCost = g[name]
 
-            for move in expander(node.info):
-                nxt_info  = follower(node.info, move)
+            for move in expander(info):
+                nxt_info  = follower(info, move)
                 nxt_name  = namer(nxt_info)
                 if nxt_name in closed:
                     continue
 
-                edge_cost: GenericCost = cost_fn(node.info, move, nxt_info)
+                edge_cost: GenericCost = cost_fn(info, move, nxt_info)
                 tentative_g: GenericCost = g_curr + edge_cost
 
-                better_path = (
-                    nxt_name not in self._g or tentative_g < self._g[nxt_name]
-                )
-                if better_path:
-                    self._g[nxt_name] = tentative_g
-                    self._parent[nxt_name] = (name, move)
+                g_prev = g.get(nxt_name)
+                if g_prev is None or tentative_g < g_prev:
+                    g[nxt_name] = tentative_g
+                    parent[nxt_name] = (name, move)
 
                     f: GenericCost = tentative_g + heuristic(nxt_info)
-                    heap.add_or_update(SolutionHeapItem(
-                        name=nxt_name,
-                        cost=f,
-                        info=nxt_info,
-                    ))
+                    heap.add_or_update(SolutionHeapItem(nxt_name, f, nxt_info))
 
         return None  # frontier exhausted, no goal found
 
@@ -255,10 +272,93 @@ class AStarSolver(
         path.reverse()
         return path
 
+# ---------------------------------------------------------------------------
+#  Memory-bounded IDA* searcher
+# ---------------------------------------------------------------------------
+class IDAStarSolver(
+    NodeSolver[GenericInfo, GenericName, GenericMove],
+    Generic[GenericInfo, GenericName, GenericMove, GenericCost]
+):
+    """
+    Iterative deepening A*: depth-first searches bounded by f = g + h,
+    raising the bound to the smallest f that went over it after each search.
+
+    Only the current path is stored, so memory grows with the solution length
+    instead of the number of states (states may be expanded more than once).
+    With an admissible heuristic, the first solution found is optimal.
+    """
+
+    def __init__(
+        self,
+        namer:      Callable[[GenericInfo], GenericName],
+        detector:   Callable[[GenericInfo], bool],
+        expander:   Callable[[GenericInfo], Iterable[GenericMove]],
+        follower:   Callable[[GenericInfo, GenericMove], GenericInfo],
+        heuristic:  Callable[[GenericInfo], GenericCost],
+        cost: Callable[[GenericInfo, GenericMove, GenericInfo], GenericCost],
+        init_cost: GenericCost # initial cost for the start node (usually 0)
+    ) -> None:
+        super().__init__(namer, detector, expander, follower)
+        self.heuristic = heuristic
+        self.cost = cost
+        self.init_cost = init_cost
+
+    def solve(self, start_info: GenericInfo) -> list[GenericMove] | None:
+        """
+        Run IDA* and return the sequence of moves that reaches a goal,
+        or None if no solution exists.
+        """
+        bound: GenericCost | None = self.init_cost + self.heuristic(start_info)
+        # names on the current path (so the search never walks in a cycle)
+        on_path: set[GenericName] = {self.get_name(start_info)}
+        path: list[GenericMove] = []
+        while bound is not None:
+            found, bound = self._search(start_info, self.init_cost, bound, on_path, path)
+            if found:
+                return path
+        return None  # nothing went over the bound, so every state was searched
+
+    def _search(
+        self,
+        info: GenericInfo,
+        g: GenericCost,
+        bound: GenericCost,
+        on_path: set[GenericName],
+        path: list[GenericMove],
+    ) -> tuple[bool, GenericCost | None]:
+        """
+        Depth-first search below ``info`` (reached with cost ``g``), extending ``path`` in place.
+        Return whether a goal was found and, if not, the smallest f that went over ``bound``.
+        """
+        f = g + self.heuristic(info)
+        if bound < f:
+            return False, f
+        if self.is_goal(info):
+            return True, None
+
+        smallest: GenericCost | None = None
+        for move in self.get_moves(info):
+            child_info = self.follow_move(info, move)
+            child_name = self.get_name(child_info)
+            if child_name in on_path:
+                continue
+
+            on_path.add(child_name)
+            path.append(move)
+            found, over = self._search(child_info, g + self.cost(info, move, child_info), bound, on_path, path)
+            if found:
+                return True, None
+            path.pop()
+            on_path.remove(child_name)
+
+            if over is not None and (smallest is None or over < smallest):
+                smallest = over
+        return False, smallest
+
 
 
 if __name__ == "__main__":
-    # Quick test to ensure that the AStarSolver works
+    # Quick test to ensure that the AStarSolver and IDAStarSolver work
 
     # ----------------- problem domain -----------------
     Coord = tuple[int, int]   # GenericInfo and GenericName are both Coord here
@@ -291,4 +391,20 @@ if __name__ == "__main__":
     assert path is not None, "solver failed to find a path"
     assert len(path) == 4,   f"expected length 4, got {len(path)}"
     print("Path:", path)
+
+    bucket_solver = AStarSolver[Coord, Coord, Move, int](
+        namer, detector, expander, follower,
+        heuristic, cost_fn, ZERO, f_is_integer=True
+    )
+    bucket_path: list[Move] | None = bucket_solver.solve((0, 0))
+    assert bucket_path is not None, "bucket-queue solver failed to find a path"
+    assert len(bucket_path) == 4,   f"expected length 4, got {len(bucket_path)}"
+
+    ida_solver = IDAStarSolver[Coord, Coord, Move, int](
+        namer, detector, expander, follower,
+        heuristic, cost_fn, ZERO
+    )
+    ida_path: list[Move] | None = ida_solver.solve((0, 0))
+    assert ida_path is not None, "IDA* solver failed to find a path"
+    assert len(ida_path) == 4,   f"expected IDA* length 4, got {len(ida_path)}"
     print("Test passed ✔")
\ No newline at end of file
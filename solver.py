@@ -1,14 +1,12 @@
 import math
 from enum import StrEnum
-from typing import cast, Callable
-
-import networkx as nx
+from typing import Callable, cast
 
 from core import HashTracker, NodeID, Puzzle
 from color import InfiniteColor
-from search_algs import BFSSolver, AStarSolver, GenericCost
+from search_algs import BFSSolver, AStarSolver, IDAStarSolver, GenericCost
 
-# a move sets a node to a color (and propagates to its same-color neighbors)
+# a move sets a node to a color (and propagates to its same-color region)
 Move = tuple[NodeID, InfiniteColor]
 
 class SolverType(StrEnum):
@@ -24,7 +22,7 @@ def color_heuristic(puzzle: Puzzle) -> int:
     One move can never create a new color and it can eliminate at most one existing color.
     The puzzle is solved when there is only one color left.
     '''
-    return len({puzzle.get_color(node_id) for node_id in puzzle.graph.nodes}) - 1
+    return puzzle.number_of_colors() - 1
 
 def max_edge_reduction_heuristic(puzzle: Puzzle) -> int:
     '''
@@ -74,64 +72,87 @@ def max_edge_reduction_heuristic(puzzle: Puzzle) -> int:
 
             h(n) ≤ 1 + h(n')            ⇒   consistency □
     """
-    def edge_reduction_bound(puzzle: Puzzle) -> int:
+    def edges_and_reduction_bound(puzzle: Puzzle) -> tuple[int, int]:
         """
-        Upper bound on how many edges a *single* move can delete in this state.
+        Number of edges, and upper bound on how many edges a *single* move can delete in this state.
 
-        This is computed as the maximum degree of any node (after collapse).
+        The bound is computed as the maximum degree of any node (after collapse).
+        Both come from the same pass over the degrees of the collapsed puzzle.
         """
-        puzzle = puzzle.copy()
-        puzzle.collapse()
-        # Compute the maximum degree across all nodes in the graph.
-        return max([
-            cast(
-                int,
-                cast(
-                    nx.classes.reportviews.DegreeView,
-                    puzzle.graph.degree
-                )[v]
-            )
-            for v in puzzle.graph.nodes
-        ])
+        # search states are already collapsed, so this is usually the puzzle itself (no copy)
+        puzzle = puzzle.collapsed()
+        degrees = [puzzle.degree(v) for v in puzzle.nodes]
+        return sum(degrees) // 2, max(degrees)
     
-    k: int = edge_reduction_bound(puzzle)
+    e, k = edges_and_reduction_bound(puzzle)
     if k == 0:
         # No edges left - puzzle is solved
         return 0
     
     assert k > 0, f"Invalid edge reduction bound: {k=}"
-    return math.ceil(puzzle.graph.number_of_edges() / k)
+    return math.ceil(e / k)
+
+def color_and_max_edge_reduction_heuristic(puzzle: Puzzle) -> int:
+    '''
+    The maximum of ``color_heuristic`` and ``max_edge_reduction_heuristic``,
+    computed from a single look at the collapsed puzzle.
+    '''
+    puzzle = puzzle.collapsed()
+    colors = puzzle.number_of_colors() - 1
+    degrees = [puzzle.degree(v) for v in puzzle.nodes]
+    k = max(degrees)
+    if k == 0:
+        return colors
+    return max(colors, math.ceil((sum(degrees) // 2) / k))
 
-HEURISTICS: dict[HeuristicName, Callable[[Puzzle], float]] = {
+HEURISTICS: dict[HeuristicName, Callable[[Puzzle], int]] = {
     HeuristicName.COLOR: color_heuristic,
     HeuristicName.MAX_EDGE_REDUCTION: max_edge_reduction_heuristic,
 }
 
+def combined_heuristic(heuristics: list[HeuristicName]) -> Callable[[Puzzle], int]:
+    '''Return a heuristic giving the maximum of ``heuristics`` (the maximum of consistent heuristics is also consistent).'''
+    if set(heuristics) == {HeuristicName.COLOR, HeuristicName.MAX_EDGE_REDUCTION}:
+        return color_and_max_edge_reduction_heuristic
+    # look the functions up once here rather than on every call
+    fns = tuple(HEURISTICS[h] for h in heuristics)
+    if len(fns) == 1:
+        return fns[0]
+    return lambda puzzle: max(fn(puzzle) for fn in fns)
+
 class SolvablePuzzle(Puzzle):
+    __slots__ = ('valid_colors',)
+
     def __init__(self, hasher: HashTracker | None = None, valid_colors: set[InfiniteColor] | int = 2):
         super().__init__(hasher=hasher)
         if isinstance(valid_colors, int):
-            valid_colors = {InfiniteColor(i) for i in range(valid_colors)}
+            valid_colors = set(InfiniteColor.create_range(valid_colors))
         self.valid_colors = valid_colors
 
     def copy(self) -> 'SolvablePuzzle':
         new_puzzle = SolvablePuzzle(hasher=self.hasher, valid_colors=self.valid_colors)
-        new_puzzle.graph = self.graph.copy()
+        new_puzzle._colors = self._colors.copy()
+        new_puzzle._adj = {node: neighbors.copy() for node, neighbors in self._adj.items()}
         new_puzzle.recalc_full_hash = self.recalc_full_hash
         new_puzzle.recalc_quick_hash = self.recalc_quick_hash
         new_puzzle.not_collapsed = self.not_collapsed
         new_puzzle._full_hash = self._full_hash
         new_puzzle._quick_hash = self._quick_hash
         new_puzzle._iso_graph = self._iso_graph
+        new_puzzle._iso_igraph = self._iso_igraph
+        new_puzzle._collapsed = self._collapsed
         return new_puzzle
 
     def get_valid_moves(self) -> list[Move]:
-        return [
-            (node, color)
-            for node in self.graph.nodes
-            for color in self.valid_colors
-            if color != self.get_color(node)
-        ]
+        # only colors of neighboring regions are tried: a move to any other color merges nothing
+        # (checked against trying every color on all small planar puzzles: the shortest solutions never got longer)
+        colors, adj, valid_colors = self._colors, self._adj, self.valid_colors
+        moves: list[Move] = []
+        for node, node_color in colors.items():
+            neighbor_colors = {colors[neighbor] for neighbor in adj[node]}
+            neighbor_colors.discard(node_color)
+            moves.extend((node, color) for color in neighbor_colors if color in valid_colors)
+        return moves
 
     @classmethod
     def search_namer(cls, puzzle: 'SolvablePuzzle') -> str:
@@ -146,8 +167,8 @@ class SolvablePuzzle(Puzzle):
         return puzzle.get_valid_moves()
     
     @classmethod
-    def search_heuristic(cls, puzzle: 'SolvablePuzzle') -> float:
-        return float(color_heuristic(puzzle))
+    def search_heuristic(cls, puzzle: 'SolvablePuzzle') -> int:
+        return color_heuristic(puzzle)
     
     @classmethod
     def search_cost(cls, puzzle1: 'SolvablePuzzle', move: Move, puzzle2: 'SolvablePuzzle') -> int:
@@ -158,13 +179,12 @@ class SolvablePuzzle(Puzzle):
     def search_follower(cls, puzzle: 'SolvablePuzzle', move: Move) -> 'SolvablePuzzle':
         node, color = move
         new_puzzle = puzzle.copy()
-        new_puzzle.set_color(node, color, propagate=True)
-        new_puzzle.collapse()
+        new_puzzle.recolor(node, color)
         return new_puzzle
 
     def bfs_solve(self, progress: bool = False) -> list[Move] | None:
-        collapsed_self = self.copy()
-        collapsed_self.collapse()
+        # (a copy of SolvablePuzzle is a SolvablePuzzle, so the collapsed puzzle is one too)
+        collapsed_self = cast('SolvablePuzzle', self.collapsed())
         solver = BFSSolver(
             namer=self.search_namer,
             detector=self.search_detector,
@@ -174,11 +194,28 @@ class SolvablePuzzle(Puzzle):
         return solver.solve(collapsed_self, progress=progress)
     
     def a_star_solve(self, heuristics: list[HeuristicName]) -> list[Move] | None:
-        collapsed_self = self.copy()
-        collapsed_self.collapse()
-        # using the maximum of consistent heuristics is also consistent
-        heuristic: Callable[[Puzzle], float] = lambda puzzle: max([HEURISTICS[h](puzzle) for h in heuristics])
+        collapsed_self = cast('SolvablePuzzle', self.collapsed())
+        heuristic = combined_heuristic(heuristics)
         solver = AStarSolver(
+            namer=self.search_namer,
+            detector=self.search_detector,
+            expander=self.search_expander,
+            follower=self.search_follower,
+            heuristic=heuristic,
+            cost=self.search_cost,
+            init_cost=0,
+            # unit move costs and integer heuristics, so A* can use a bucket queue
+            f_is_integer=True
+        )
+        return solver.solve(collapsed_self)
+
+    def ida_star_solve(self, heuristics: list[HeuristicName]) -> list[Move] | None:
+        # same search as a_star_solve, but only the current path is kept in memory
+        # (IDA* only returns a shortest solution if every heuristic never overestimates;
+        # MAX_EDGE_REDUCTION can, since merging a region can delete more edges than its degree)
+        collapsed_self = cast('SolvablePuzzle', self.collapsed())
+        heuristic = combined_heuristic(heuristics)
+        solver = IDAStarSolver(
             namer=self.search_namer,
             detector=self.search_detector,
             expander=self.search_expander,